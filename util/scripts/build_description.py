@@ -9,30 +9,293 @@ Runs all 4 steps:
   4. split_urdf.py        — split into joints/links xacro files
 
 Then copies the results (xacro files + meshes) to the target robot_description package.
+The steps can also be printed as a JSON plan (--dry-run) or written out as a ninja
+build file (--emit-ninja) so only steps with changed inputs are rerun.
 
 Usage (run from repo root):
     python util/scripts/build_description.py /path/to/my_robot_description
     python util/scripts/build_description.py /path/to/dual_arm_description -r 0.2 --fixed-legs
     python util/scripts/build_description.py /path/to/dual_arm_description --skip-simplify
+    python util/scripts/build_description.py /path/to/dual_arm_description --dry-run
+    python util/scripts/build_description.py /path/to/dual_arm_description --emit-ninja build.ninja
 """
 
 import argparse
+import json
 import os
+import shlex
 import shutil
-import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
+from apply_joint_limits import main as apply_joint_limits_main
+from simplify_meshes import main as simplify_meshes_main, manifest_is_current
+from split_urdf import main as split_urdf_main
+from urdf_simplify import main as urdf_simplify_main
 
-def run(cmd: list[str], desc: str, cwd: str) -> None:
-    """Run a command, printing it and checking for errors."""
+
+def run(step_main, argv: list[str], desc: str) -> None:
+    """Run a pipeline step's main() in-process, printing it and checking for errors."""
     print(f"\n{'='*70}")
     print(f"  {desc}")
-    print(f"  $ {' '.join(cmd)}")
+    print(f"  $ {step_main.__module__}.py {' '.join(argv)}")
     print(f"{'='*70}\n")
-    result = subprocess.run(cmd, check=False, cwd=cwd)
-    if result.returncode != 0:
-        print(f"\nERROR: {desc} failed (exit code {result.returncode})")
-        sys.exit(1)
+    try:
+        step_main(argv)
+    except SystemExit as e:
+        if e.code:
+            print(f"\nERROR: {desc} failed (exit code {e.code})")
+            sys.exit(1)
+
+
+def fast_copy(src: str, dst: str, link: bool = True) -> None:
+    """
+    Copy src to dst as cheaply as the filesystem allows.
+
+    Tries a hardlink first (when link=True), then a zero-copy os.sendfile on
+    Linux, and finally a userspace copy with a 1 MiB buffer.
+    """
+    if os.path.lexists(dst):
+        os.remove(dst)
+
+    if link:
+        try:
+            os.link(src, dst)
+            return
+        except OSError:
+            pass  # cross-device or unsupported, fall through to a real copy
+
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        if sys.platform.startswith("linux"):
+            size = os.fstat(fsrc.fileno()).st_size
+            offset = 0
+            while offset < size:
+                sent = os.sendfile(fdst.fileno(), fsrc.fileno(), offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+        else:
+            shutil.copyfileobj(fsrc, fdst, length=1 << 20)
+    shutil.copystat(src, dst)
+
+
+# Pipeline step scripts, executed in-process by run()
+STEP_MAINS = {
+    "urdf_simplify.py": urdf_simplify_main,
+    "apply_joint_limits.py": apply_joint_limits_main,
+    "simplify_meshes.py": simplify_meshes_main,
+    "split_urdf.py": split_urdf_main,
+}
+
+
+def plan(args: argparse.Namespace, package_name: str) -> list[dict]:
+    """
+    Build the list of pipeline steps to run.
+
+    Each step is a dict with desc, script, argv, inputs and outputs (paths
+    relative to the repo root), so the same plan can be executed in-process,
+    printed as JSON or turned into a ninja build file.
+    """
+    simplified_urdf = os.path.join("urdf", "robot_simplified.urdf")
+    limits_urdf = os.path.join("urdf", "robot_with_limits.urdf")
+    gazebo_urdf = os.path.join("urdf", "robot_gazebo.urdf")
+    steps = []
+
+    # Step 1: Simplify URDF structure
+    if not args.skip_simplify:
+        config = os.path.join("util", "configs", "simplify_config.yaml")
+        steps.append({
+            "desc": "Step 1/4: Simplify URDF structure",
+            "script": "urdf_simplify.py",
+            "argv": [args.source_urdf, "-o", simplified_urdf, "-c", config],
+            "inputs": [args.source_urdf, config],
+            "outputs": [simplified_urdf],
+        })
+
+    # Step 2: Apply joint limits
+    if not args.skip_limits:
+        config = os.path.join("util", "configs", "joint_limits.yaml")
+        steps.append({
+            "desc": "Step 2/4: Apply joint limits",
+            "script": "apply_joint_limits.py",
+            "argv": ["-i", simplified_urdf, "-o", limits_urdf, "-c", config],
+            "inputs": [simplified_urdf, config],
+            "outputs": [limits_urdf],
+        })
+
+    # Step 3: Simplify meshes (reads originals from assets/)
+    simplify_args = [
+        "-i", limits_urdf,
+        "-o", gazebo_urdf,
+        "-r", str(args.ratio),
+        "--visual-dir", os.path.join("urdf", "meshes", "visual") + "/",
+        "--collision-dir", os.path.join("urdf", "meshes", "collision") + "/",
+    ]
+    if args.convex_decomposition:
+        simplify_args += ["--convex-decomposition", "--max-hulls", str(args.max_hulls)]
+        collision_desc = "convex decomposition"
+    else:
+        simplify_args += ["--convex-collision"]
+        collision_desc = "convex collision"
+    with os.scandir("assets") as it:
+        source_meshes = sorted(e.path for e in it if e.name.endswith(".stl"))
+    steps.append({
+        "desc": f"Step 3/4: Decimate meshes (visual + {collision_desc})",
+        "script": "simplify_meshes.py",
+        "argv": simplify_args,
+        "inputs": [limits_urdf] + source_meshes,
+        "outputs": [gazebo_urdf],
+        "manifest": os.path.join(".mesh_cache", "manifest.json"),
+    })
+
+    # Step 4: Split into xacro files
+    split_args = [
+        "-i", gazebo_urdf,
+        "-p", package_name,
+        "-o", "urdf/",
+        "--damping", str(args.damping),
+        "--friction", str(args.friction),
+    ]
+    if args.fixed_legs:
+        split_args.append("--fixed-legs")
+    steps.append({
+        "desc": "Step 4/4: Split into joints/links xacro files",
+        "script": "split_urdf.py",
+        "argv": split_args,
+        "inputs": [gazebo_urdf],
+        "outputs": [
+            os.path.join("urdf", "joints", "gazebo_joints.xacro"),
+            os.path.join("urdf", "links", "gazebo_links.xacro"),
+        ],
+    })
+
+    return steps
+
+
+def _ninja_path(path: str) -> str:
+    """Escape a path for use in a ninja build statement."""
+    return path.replace("$", "$$").replace(" ", "$ ").replace(":", "$:")
+
+
+def write_ninja(
+    path: str, steps: list[dict], script_dir: str, target: str, package_name: str
+) -> None:
+    """
+    Write a ninja build file for the planned steps plus the deploy step.
+
+    ninja then only reruns steps whose inputs changed (by mtime). The mesh
+    step uses restat: simplify_meshes.py leaves its URDF and outputs stamp
+    untouched when nothing changed, so a rerun that only hits the mesh cache
+    stops there, while changed meshes still trigger the deploy.
+    """
+    def paths(items):
+        return " ".join(_ninja_path(p) for p in items)
+
+    lines = [
+        "# Generated by build_description.py --emit-ninja, do not edit.",
+        "# Run from the repo root.",
+        "",
+        f"python = {_ninja_path(sys.executable)}",
+        f"scripts = {_ninja_path(script_dir)}",
+        "",
+        "rule step",
+        "  command = $python $scripts/$script $args",
+        "  description = $desc",
+        "  pool = console",
+        "",
+        "rule deploy",
+        "  command = $python $scripts/build_description.py $args && touch $out",
+        "  description = $desc",
+        "  pool = console",
+        "",
+        "rule mesh_step",
+        "  command = $python $scripts/$script $args",
+        "  description = $desc",
+        "  pool = console",
+        "  restat = 1",
+        "",
+    ]
+    # The mesh step rewrites urdf/meshes/* even when the URDF stays the same,
+    # so it also produces a stamp of output digests that the deploy depends on
+    mesh_stamp = os.path.join(".ninja_stamps", "meshes.stamp")
+    for step in steps:
+        rule, outputs, argv = "step", step["outputs"], step["argv"]
+        if "manifest" in step:
+            rule = "mesh_step"
+            outputs = outputs + [mesh_stamp]
+            argv = argv + ["--outputs-stamp", mesh_stamp]
+        lines += [
+            f"build {paths(outputs)}: {rule} {paths(step['inputs'])}",
+            f"  script = {step['script']}",
+            f"  args = {shlex.join(argv).replace('$', '$$')}",
+            f"  desc = {step['desc']}",
+            "",
+        ]
+
+    # Deployed files keep their source mtimes, so track the deploy with a stamp
+    stamp = os.path.join(".ninja_stamps", f"deploy_{package_name}.stamp")
+    lines += [
+        f"build {_ninja_path(stamp)}: deploy {paths(steps[-1]['outputs'] + [mesh_stamp])}",
+        f"  args = {shlex.join([target, '--deploy-only']).replace('$', '$$')}",
+        f"  desc = Deploy to {target}",
+        "",
+        f"default {_ninja_path(stamp)}",
+        "",
+    ]
+
+    with open(path, "w") as f:
+        f.write("\n".join(lines))
+
+
+def deploy(repo_root: str, target: str, package_name: str) -> None:
+    """Copy the generated xacro files and meshes into the target package."""
+    print(f"\n{'='*70}")
+    print(f"  Deploying to {target}")
+    print(f"{'='*70}\n")
+
+    # Derive xacro base name (e.g. "dual_arm" from "dual_arm_description")
+    xacro_name = package_name.replace("_description", "")
+
+    # Copy xacro files
+    joints_src = os.path.join(repo_root, "urdf", "joints", "gazebo_joints.xacro")
+    links_src = os.path.join(repo_root, "urdf", "links", "gazebo_links.xacro")
+    joints_dst = os.path.join(target, "urdf", "joints", f"{xacro_name}_joints.xacro")
+    links_dst = os.path.join(target, "urdf", "links", f"{xacro_name}_links.xacro")
+
+    os.makedirs(os.path.dirname(joints_dst), exist_ok=True)
+    os.makedirs(os.path.dirname(links_dst), exist_ok=True)
+
+    # No hardlinks here: split_urdf.py rewrites its outputs in place, which
+    # would silently modify the deployed package on the next build
+    fast_copy(joints_src, joints_dst, link=False)
+    print(f"  Copied: {joints_dst}")
+    fast_copy(links_src, links_dst, link=False)
+    print(f"  Copied: {links_dst}")
+
+    # Copy meshes, overlapping the transfers in a thread pool
+    pairs = []
+    copied = {}
+    for mesh_type in ["visual", "collision"]:
+        src_dir = os.path.join(repo_root, "urdf", "meshes", mesh_type)
+        dst_dir = os.path.join(target, "meshes", mesh_type)
+        os.makedirs(dst_dir, exist_ok=True)
+
+        with os.scandir(src_dir) as it:
+            entries = [e for e in it if e.name.endswith(".stl") and e.is_file()]
+        entries.sort(key=lambda e: e.name)
+        pairs.extend((e.path, os.path.join(dst_dir, e.name)) for e in entries)
+        size = sum(e.stat().st_size for e in entries)
+        copied[mesh_type] = (len(entries), size, dst_dir)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda pair: fast_copy(*pair), pairs))
+
+    for mesh_type, (count, size, dst_dir) in copied.items():
+        print(f"  Copied: {count} {mesh_type} meshes ({size/1024/1024:.1f} MB) -> {dst_dir}")
+
+    print(f"\nDone! Package '{package_name}' updated.")
+    print(f"  Xacro files:  {xacro_name}_joints.xacro, {xacro_name}_links.xacro")
+    print(f"  Mesh paths:   package://{package_name}/meshes/visual|collision/*.stl")
 
 
 def main():
@@ -55,6 +318,17 @@ def main():
         default=0.2,
         help="Visual mesh decimation ratio (default: 0.2 = 20%%)",
     )
+    parser.add_argument(
+        "--convex-decomposition",
+        action="store_true",
+        help="Use CoACD convex decomposition for collision meshes instead of a single hull",
+    )
+    parser.add_argument(
+        "--max-hulls",
+        type=int,
+        default=8,
+        help="Maximum convex hulls per mesh with --convex-decomposition (default: 8)",
+    )
     parser.add_argument(
         "--skip-simplify",
         action="store_true",
@@ -70,6 +344,22 @@ def main():
         action="store_true",
         help="Add xacro support for fixed_legs argument",
     )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Print the planned steps (inputs, outputs, arguments) as JSON and exit",
+    )
+    parser.add_argument(
+        "--emit-ninja",
+        metavar="PATH",
+        default=None,
+        help="Write a ninja build file for incremental rebuilds instead of running",
+    )
+    parser.add_argument(
+        "--deploy-only",
+        action="store_true",
+        help="Only copy existing xacro files and meshes to the target package",
+    )
     parser.add_argument(
         "--damping",
         type=float,
@@ -83,111 +373,58 @@ def main():
         help="Joint friction (default: 0.1)",
     )
     args = parser.parse_args()
+    if args.max_hulls < 1:
+        parser.error("--max-hulls must be at least 1")
 
     # Resolve paths — repo root is two levels up from this script
     script_dir = os.path.dirname(os.path.abspath(__file__))
     repo_root = os.path.abspath(os.path.join(script_dir, "..", ".."))
     target = os.path.abspath(args.target)
     package_name = os.path.basename(target)
+    ninja_path = os.path.abspath(args.emit_ninja) if args.emit_ninja else None
 
-    print(f"Repo root:      {repo_root}")
-    print(f"Target package: {package_name}")
-    print(f"Target path:    {target}")
+    # Keep stdout pure JSON for --dry-run
+    if not args.dry_run:
+        print(f"Repo root:      {repo_root}")
+        print(f"Target package: {package_name}")
+        print(f"Target path:    {target}")
 
     if not os.path.isdir(target):
         print(f"ERROR: Target directory does not exist: {target}")
         sys.exit(1)
 
-    # Step 1: Simplify URDF structure
-    if not args.skip_simplify:
-        run(
-            [sys.executable, os.path.join(script_dir, "urdf_simplify.py"),
-             args.source_urdf,
-             "-o", os.path.join("urdf", "robot_simplified.urdf"),
-             "-c", os.path.join("util", "configs", "simplify_config.yaml")],
-            "Step 1/4: Simplify URDF structure",
-            cwd=repo_root,
-        )
-    else:
-        print("\n-- Skipping step 1 (urdf_simplify.py)")
-
-    # Step 2: Apply joint limits
-    if not args.skip_limits:
-        run(
-            [sys.executable, os.path.join(script_dir, "apply_joint_limits.py"),
-             "-i", os.path.join("urdf", "robot_simplified.urdf"),
-             "-o", os.path.join("urdf", "robot_with_limits.urdf"),
-             "-c", os.path.join("util", "configs", "joint_limits.yaml")],
-            "Step 2/4: Apply joint limits",
-            cwd=repo_root,
-        )
-    else:
-        print("\n-- Skipping step 2 (apply_joint_limits.py)")
-
-    # Step 3: Simplify meshes
-    run(
-        [sys.executable, os.path.join(script_dir, "simplify_meshes.py"),
-         "-i", os.path.join("urdf", "robot_with_limits.urdf"),
-         "-o", os.path.join("urdf", "robot_gazebo.urdf"),
-         "-r", str(args.ratio),
-         "--visual-dir", os.path.join("urdf", "meshes", "visual") + "/",
-         "--collision-dir", os.path.join("urdf", "meshes", "collision") + "/",
-         "--convex-collision"],
-        "Step 3/4: Decimate meshes (visual + convex collision)",
-        cwd=repo_root,
-    )
-
-    # Step 4: Split into xacro files
-    split_cmd = [
-        sys.executable, os.path.join(script_dir, "split_urdf.py"),
-        "-i", os.path.join("urdf", "robot_gazebo.urdf"),
-        "-p", package_name,
-        "-o", "urdf/",
-        "--damping", str(args.damping),
-        "--friction", str(args.friction),
-    ]
-    if args.fixed_legs:
-        split_cmd.append("--fixed-legs")
-    run(split_cmd, "Step 4/4: Split into joints/links xacro files", cwd=repo_root)
-
-    # Deploy to target package
-    print(f"\n{'='*70}")
-    print(f"  Deploying to {target}")
-    print(f"{'='*70}\n")
+    # Steps run in-process and take paths relative to the repo root
+    os.chdir(repo_root)
 
-    # Derive xacro base name (e.g. "dual_arm" from "dual_arm_description")
-    xacro_name = package_name.replace("_description", "")
+    if args.deploy_only:
+        deploy(repo_root, target, package_name)
+        return
 
-    # Copy xacro files
-    joints_src = os.path.join(repo_root, "urdf", "joints", "gazebo_joints.xacro")
-    links_src = os.path.join(repo_root, "urdf", "links", "gazebo_links.xacro")
-    joints_dst = os.path.join(target, "urdf", "joints", f"{xacro_name}_joints.xacro")
-    links_dst = os.path.join(target, "urdf", "links", f"{xacro_name}_links.xacro")
+    steps = plan(args, package_name)
 
-    os.makedirs(os.path.dirname(joints_dst), exist_ok=True)
-    os.makedirs(os.path.dirname(links_dst), exist_ok=True)
+    if args.dry_run:
+        print(json.dumps(steps, indent=2))
+        return
 
-    shutil.copy2(joints_src, joints_dst)
-    print(f"  Copied: {joints_dst}")
-    shutil.copy2(links_src, links_dst)
-    print(f"  Copied: {links_dst}")
+    if ninja_path:
+        write_ninja(ninja_path, steps, script_dir, target, package_name)
+        print(f"\nNinja file written: {ninja_path}")
+        print(f"  Build with: ninja -C {repo_root} -f {ninja_path}")
+        return
 
-    # Copy meshes
-    for mesh_type in ["visual", "collision"]:
-        src_dir = os.path.join(repo_root, "urdf", "meshes", mesh_type)
-        dst_dir = os.path.join(target, "meshes", mesh_type)
-        os.makedirs(dst_dir, exist_ok=True)
+    if args.skip_simplify:
+        print("\n-- Skipping step 1 (urdf_simplify.py)")
+    if args.skip_limits:
+        print("\n-- Skipping step 2 (apply_joint_limits.py)")
 
-        count = 0
-        for f in sorted(os.listdir(src_dir)):
-            if f.endswith(".stl"):
-                shutil.copy2(os.path.join(src_dir, f), os.path.join(dst_dir, f))
-                count += 1
-        print(f"  Copied: {count} {mesh_type} meshes -> {dst_dir}")
+    for step in steps:
+        # Step 3 is skipped when the mesh cache manifest is current
+        if "manifest" in step and manifest_is_current(step["manifest"], step["argv"]):
+            print(f"\n-- Skipping {step['script']}, meshes are up to date")
+            continue
+        run(STEP_MAINS[step["script"]], step["argv"], step["desc"])
 
-    print(f"\nDone! Package '{package_name}' updated.")
-    print(f"  Xacro files:  {xacro_name}_joints.xacro, {xacro_name}_links.xacro")
-    print(f"  Mesh paths:   package://{package_name}/meshes/visual|collision/*.stl")
+    deploy(repo_root, target, package_name)
 
 
 if __name__ == "__main__":
@@ -2,9 +2,10 @@
 """
 Reduce mesh complexity (decimate) for all STL files referenced in a URDF.
 
-Uses Open3D's quadric decimation to reduce triangle count while preserving
-shape quality. Outputs simplified meshes to a separate directory and
-generates a new URDF pointing to them.
+Uses quadric decimation (pyfqmr's Fast-Quadric-Mesh-Simplification, or
+Open3D as a fallback) to reduce triangle count while preserving shape
+quality. Outputs simplified meshes to a separate directory and generates
+a new URDF pointing to them.
 
 For collision meshes, can generate convex hulls which are much faster
 for physics engines like Gazebo (ODE/Bullet/DART).
@@ -14,48 +15,200 @@ Usage:
     python simplify_meshes.py -r 0.1                    # keep 10% of triangles
     python simplify_meshes.py -i robot.urdf -r 0.05     # custom input, 5%
     python simplify_meshes.py --convex-collision         # convex hulls for collision
+    python simplify_meshes.py --convex-decomposition     # CoACD multi-hull collision
+    python simplify_meshes.py -j 4                      # limit to 4 worker processes
+    python simplify_meshes.py --backend open3d           # use Open3D decimation
+    python simplify_meshes.py --no-cache                 # ignore .mesh_cache/
 """
 
 import argparse
+import gc
+import hashlib
+import io
+import json
+import multiprocessing
 import os
 import shutil
 import struct
+import sys
 import xml.etree.ElementTree as ET
 
 import numpy as np
-import open3d as o3d
+from scipy.spatial import ConvexHull, QhullError
+
+try:
+    import pyfqmr
+    import trimesh
+except ImportError:  # optional: fall back to Open3D decimation
+    pyfqmr = None
+
+try:
+    import coacd
+    coacd.set_log_level("error")
+except ImportError:  # optional: only needed for --convex-decomposition
+    coacd = None
+
+try:
+    import open3d as o3d
+except ImportError:  # optional: only needed for --backend open3d
+    o3d = None
+
+
+# Binary STL: 80-byte header followed by a little-endian uint32 triangle count
+_TRI_HDR = struct.Struct("<I")
 
 
 def count_stl_triangles(path: str) -> int:
     """Quick triangle count from binary STL header (no full parse needed)."""
-    with open(path, "rb") as f:
-        f.read(80)
-        return struct.unpack("<I", f.read(4))[0]
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        buf = os.pread(fd, 84, 0)
+    finally:
+        os.close(fd)
+    return _TRI_HDR.unpack_from(buf, 80)[0]
+
+
+# Binary STL triangle record: facet normal, 3 vertices, attribute byte count
+_STL_DTYPE = np.dtype([("n", "<f4", (3,)), ("v", "<f4", (3, 3)), ("attr", "<u2")])
+
+
+def _stl_read_np(path: str) -> np.ndarray:
+    """Read a binary STL straight into a structured array of triangle records."""
+    count = count_stl_triangles(path)
+    triangles = np.fromfile(path, dtype=_STL_DTYPE, count=count, offset=84)
+    if len(triangles) != count:
+        raise ValueError(f"{path}: not a binary STL or truncated")
+    return triangles
 
 
-def decimate_mesh(input_path: str, output_path: str, ratio: float) -> dict:
+def _stl_write_np(path: str, triangles: np.ndarray) -> None:
+    """Write (N, 3, 3) triangle vertices as a binary STL with facet normals."""
+    records = np.zeros(len(triangles), dtype=_STL_DTYPE)
+    records["v"] = triangles
+    normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    records["n"] = np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
+    with open(path, "wb") as f:
+        f.write(bytes(80))
+        f.write(_TRI_HDR.pack(len(records)))
+        records.tofile(f)
+
+
+def convex_hull_mesh(input_path: str, output_path: str) -> dict:
     """
-    Decimate a mesh using quadric error metric.
+    Compute convex hull of a mesh - ideal for collision geometry.
 
-    Returns dict with stats: original_triangles, final_triangles, reduction_pct.
+    Only the vertex cloud is needed, so the STL is read with numpy and handed
+    straight to QHull instead of building a full Open3D mesh.
+
+    Returns dict with stats.
     """
-    mesh = o3d.io.read_triangle_mesh(input_path)
-    original = len(mesh.triangles)
+    points = _stl_read_np(input_path)["v"].reshape(-1, 3)
+    original = len(points) // 3
 
     if original == 0:
         shutil.copy2(input_path, output_path)
         return {"original": 0, "final": 0, "reduction_pct": 0.0}
 
-    target = max(int(original * ratio), 50)
+    try:
+        hull = ConvexHull(points)
+    except QhullError:
+        # Flat / degenerate geometry has no volume to wrap, keep it as-is
+        shutil.copy2(input_path, output_path)
+        return {"original": original, "final": original, "reduction_pct": 0.0}
+
+    # QHull doesn't orient its simplices, flip any that face inward
+    triangles = points[hull.simplices]
+    normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    inward = np.einsum("ij,ij->i", normals, hull.equations[:, :3]) < 0
+    triangles[inward] = triangles[inward][:, [0, 2, 1]]
+    del points, hull, normals  # the full-resolution point cloud is no longer needed
+
+    _stl_write_np(output_path, triangles)
+    final = len(triangles)
+
+    return {
+        "original": original,
+        "final": final,
+        "reduction_pct": (1 - final / original) * 100 if original > 0 else 0,
+    }
+
+
+# pyfqmr can stall well short of the target on some meshes (e.g. b_base keeps
+# 23% at -r 0.2); results above target * _TARGET_SLACK count as a miss
+_TARGET_SLACK = 1.1
+
+
+def _decimation_target(original: int, ratio: float) -> int:
+    """Triangle count decimation aims for."""
+    return max(int(original * ratio), 50)
+
+
+def _decimate_fqmr(input_path: str, output_path: str, target: int) -> int:
+    """Decimate with Fast-Quadric-Mesh-Simplification, returns final triangle count."""
+    mesh = trimesh.load(input_path, force="mesh")
+    simplifier = pyfqmr.Simplify()
+    simplifier.setMesh(mesh.vertices, mesh.faces)
+    del mesh  # the simplifier holds its own copy
+    simplifier.simplify_mesh(
+        target_count=target, aggressiveness=7, preserve_border=True, verbose=False
+    )
+    vertices, faces, _ = simplifier.getMesh()
+    del simplifier
+    trimesh.Trimesh(vertices, faces, process=False).export(output_path)
+    final = len(faces)
+    del vertices, faces
+    gc.collect()
+    return final
+
+
+def _decimate_open3d(input_path: str, output_path: str, target: int) -> int:
+    """Decimate with Open3D's quadric decimation, returns final triangle count."""
+    mesh = o3d.io.read_triangle_mesh(input_path)
 
     simplified = mesh.simplify_quadric_decimation(
         target_number_of_triangles=target
     )
+    del mesh  # don't hold input and output meshes at the same time
 
-    simplified.compute_vertex_normals()
+    # STL only stores facet normals, which Open3D's STL writer requires
+    simplified.compute_triangle_normals()
 
-    o3d.io.write_triangle_mesh(output_path, simplified)
+    o3d.io.write_triangle_mesh(
+        output_path, simplified,
+        write_ascii=False, compressed=False, write_vertex_normals=False,
+    )
     final = len(simplified.triangles)
+    del simplified
+    gc.collect()
+    return final
+
+
+def decimate_mesh(
+    input_path: str, output_path: str, ratio: float, backend: str = "fqmr"
+) -> dict:
+    """
+    Decimate a mesh using quadric error metric.
+
+    backend is "fqmr" (pyfqmr, much faster) or "open3d". pyfqmr results that
+    miss the target are redone with Open3D when it is installed.
+
+    Returns dict with stats: original_triangles, final_triangles, reduction_pct.
+    """
+    original = count_stl_triangles(input_path)
+
+    if original == 0:
+        shutil.copy2(input_path, output_path)
+        return {"original": 0, "final": 0, "reduction_pct": 0.0}
+
+    target = _decimation_target(original, ratio)
+
+    if backend == "fqmr":
+        final = _decimate_fqmr(input_path, output_path, target)
+        if final > target * _TARGET_SLACK and o3d is not None:
+            final = _decimate_open3d(input_path, output_path, target)
+    else:
+        final = _decimate_open3d(input_path, output_path, target)
 
     return {
         "original": original,
@@ -64,24 +217,30 @@ def decimate_mesh(input_path: str, output_path: str, ratio: float) -> dict:
     }
 
 
-def convex_hull_mesh(input_path: str, output_path: str) -> dict:
+def convex_decomposition_mesh(input_path: str, output_path: str, max_hulls: int) -> dict:
     """
-    Compute convex hull of a mesh - ideal for collision geometry.
+    Approximate convex decomposition (CoACD) - better contacts for non-convex parts.
+
+    The resulting hulls are concatenated into one STL so each link keeps a
+    single collision mesh.
 
     Returns dict with stats.
     """
-    mesh = o3d.io.read_triangle_mesh(input_path)
-    original = len(mesh.triangles)
+    triangles = _stl_read_np(input_path)["v"]
+    original = len(triangles)
 
     if original == 0:
         shutil.copy2(input_path, output_path)
         return {"original": 0, "final": 0, "reduction_pct": 0.0}
 
-    hull, _ = mesh.compute_convex_hull()
-    hull.compute_vertex_normals()
+    # CoACD needs an indexed mesh, STL is a triangle soup
+    vertices, faces = np.unique(triangles.reshape(-1, 3), axis=0, return_inverse=True)
+    mesh = coacd.Mesh(vertices.astype(np.float64), faces.reshape(-1, 3).astype(np.int64))
+    parts = coacd.run_coacd(mesh, threshold=0.05, max_convex_hull=max_hulls)
 
-    o3d.io.write_triangle_mesh(output_path, hull)
-    final = len(hull.triangles)
+    hull_triangles = np.concatenate([np.asarray(v)[np.asarray(f)] for v, f in parts])
+    _stl_write_np(output_path, hull_triangles)
+    final = len(hull_triangles)
 
     return {
         "original": original,
@@ -90,21 +249,247 @@ def convex_hull_mesh(input_path: str, output_path: str) -> dict:
     }
 
 
-def find_urdf_meshes(urdf_path: str) -> list[str]:
-    """Extract unique mesh filenames from URDF (both visual and collision)."""
-    tree = ET.parse(urdf_path)
-    root = tree.getroot()
+def _file_digest(path: str) -> str:
+    """Content hash of a file, used as the mesh cache key."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    """Hardlink src to dst (replacing dst), falling back to a copy across devices."""
+    if os.path.lexists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _copy_replacing(src: str, dst: str) -> None:
+    """Copy src to a fresh dst file, never writing through an existing hardlink."""
+    if os.path.lexists(dst):
+        os.remove(dst)
+    shutil.copy2(src, dst)
+
+
+def cached_mesh_op(
+    cache_dir: str | None, key: str, input_path: str, output_path: str, op, *op_args
+) -> dict:
+    """
+    Run op(input_path, output_path, *op_args) through the mesh cache.
+
+    Results are stored as <cache_dir>/<key>.stl and linked into place, so an
+    unchanged source mesh is only decimated once across runs.
+    """
+    if cache_dir is None:
+        # Outputs may still be hardlinks into an old cache; never write through them
+        if os.path.lexists(output_path):
+            os.remove(output_path)
+        return op(input_path, output_path, *op_args)
+
+    cache_path = os.path.join(cache_dir, f"{key}.stl")
+    if os.path.exists(cache_path):
+        original = count_stl_triangles(input_path)
+        final = count_stl_triangles(cache_path)
+        stats = {
+            "original": original,
+            "final": final,
+            "reduction_pct": (1 - final / original) * 100 if original > 0 else 0,
+            "cached": True,
+        }
+    else:
+        # Write to a private temp file first so concurrent workers never see
+        # a partial cache entry
+        tmp_path = os.path.join(cache_dir, f"{key}.{os.getpid()}.tmp.stl")
+        try:
+            stats = op(input_path, tmp_path, *op_args)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            if os.path.lexists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    _link_or_copy(cache_path, output_path)
+    return stats
+
+
+def manifest_is_current(manifest_path: str, argv: list[str]) -> bool:
+    """
+    Check whether a previous run with the same arguments is still up to date.
+
+    True if the manifest was written for identical argv and none of the
+    recorded inputs (URDF + source meshes) or outputs changed since. Source
+    meshes that were missing are recorded with a None digest, so one that
+    appears later makes the run stale.
+    """
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return False
+
+    if manifest.get("argv") != argv:
+        return False
+    recorded = {**manifest.get("inputs", {}), **manifest.get("outputs", {})}
+    for path, digest in recorded.items():
+        if digest is None:
+            if os.path.exists(path):
+                return False
+        elif not os.path.exists(path) or _file_digest(path) != digest:
+            return False
+    return True
+
+
+def write_manifest(
+    manifest_path: str,
+    argv: list[str],
+    inputs: dict[str, str | None],
+    outputs: dict[str, str],
+) -> None:
+    """Record the arguments plus input and output digests of a completed run."""
+    manifest = {"argv": argv, "inputs": inputs, "outputs": outputs}
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def _write_if_changed(path: str, data: bytes) -> bool:
+    """
+    Write data to path unless the file already holds exactly these bytes.
+
+    Leaving unchanged files untouched keeps their mtime, so mtime-based
+    builds (ninja restat) don't rerun downstream steps. Returns True if written.
+    """
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+    except OSError:
+        pass
+    with open(path, "wb") as f:
+        f.write(data)
+    return True
+
+
+def _convex_collision(
+    cache_dir: str | None,
+    digest: str,
+    mesh_path: str,
+    col_path: str,
+    collision_mode: str,
+    max_hulls: int,
+) -> dict:
+    """Single convex hull, or a CoACD decomposition in "decomposition" mode."""
+    if collision_mode == "decomposition":
+        return cached_mesh_op(
+            cache_dir, f"{digest}_coacd-{max_hulls}", mesh_path, col_path,
+            convex_decomposition_mesh, max_hulls,
+        )
+    return cached_mesh_op(
+        cache_dir, f"{digest}_convex", mesh_path, col_path, convex_hull_mesh
+    )
+
+
+def process_mesh(
+    mesh_path: str,
+    visual_path: str,
+    col_path: str | None,
+    digest: str,
+    ratio: float,
+    collision_mode: str | None,
+    collision_ratio: float,
+    min_triangles: int,
+    backend: str,
+    cache_dir: str | None,
+    max_hulls: int,
+) -> dict:
+    """
+    Produce the visual (and optional collision) mesh for one source STL.
+
+    Runs in a worker process, so it only takes picklable arguments and
+    returns a stats dict instead of printing.
+    """
+    tri_count = count_stl_triangles(mesh_path)
+    orig_size = os.path.getsize(mesh_path)
+    result = {
+        "basename": os.path.basename(mesh_path),
+        "digest": digest,
+        "triangles": tri_count,
+        "orig_size": orig_size,
+        "copied": tri_count < min_triangles,
+        "collision": None,
+    }
+    # fqmr output depends on whether the Open3D retry was available
+    if backend == "fqmr" and o3d is not None:
+        backend = "fqmr+open3d"
+    decimate_key = f"{digest}_decimate-{backend}"
+
+    # Skip decimation for small meshes
+    if result["copied"]:
+        if os.path.abspath(mesh_path) != os.path.abspath(visual_path):
+            _copy_replacing(mesh_path, visual_path)
+        result["visual"] = {"original": tri_count, "final": tri_count, "reduction_pct": 0.0}
+        result["new_size"] = orig_size
+        # Collision for small meshes
+        if col_path:
+            if collision_mode == "decimate":
+                _copy_replacing(mesh_path, col_path)
+                result["collision"] = {
+                    "original": tri_count, "final": tri_count, "reduction_pct": 0.0,
+                }
+            else:
+                result["collision"] = _convex_collision(
+                    cache_dir, digest, mesh_path, col_path, collision_mode, max_hulls
+                )
+        return result
+
+    # Visual mesh
+    result["visual"] = cached_mesh_op(
+        cache_dir, f"{decimate_key}_{ratio}", mesh_path, visual_path,
+        decimate_mesh, ratio, backend,
+    )
+    result["new_size"] = os.path.getsize(visual_path)
+
+    # Collision mesh
+    if col_path:
+        if collision_mode == "decimate":
+            result["collision"] = cached_mesh_op(
+                cache_dir, f"{decimate_key}_{collision_ratio}", mesh_path, col_path,
+                decimate_mesh, collision_ratio, backend,
+            )
+        else:
+            result["collision"] = _convex_collision(
+                cache_dir, digest, mesh_path, col_path, collision_mode, max_hulls
+            )
+
+    return result
+
+
+_PKG_PREFIX = "package://"
+
+
+def _stl_filenames(mesh_elements) -> list[str]:
+    """Unique STL filenames (package:// stripped) from <mesh> elements."""
     meshes = set()
-    for mesh_el in root.iter("mesh"):
-        filename = mesh_el.get("filename", "")
-        # Strip package:// prefix
-        if filename.startswith("package://"):
-            filename = filename[len("package://"):]
+    for mesh_el in mesh_elements:
+        filename = mesh_el.get("filename", "").removeprefix(_PKG_PREFIX)
         if filename.endswith(".stl"):
             meshes.add(filename)
     return sorted(meshes)
 
 
+def load_urdf_meshes(urdf_path: str) -> tuple[ET.ElementTree, list[str]]:
+    """
+    Parse a URDF once, returning the tree and its unique mesh filenames.
+
+    The tree can be handed to create_output_urdf so the file isn't parsed twice.
+    """
+    tree = ET.parse(urdf_path)
+    return tree, _stl_filenames(tree.getroot().iter("mesh"))
+
+
 def _package_prefix(dir_path: str) -> str:
     """Strip leading directories before 'meshes/' for package:// paths."""
     idx = dir_path.find("meshes/")
@@ -114,48 +499,52 @@ def _package_prefix(dir_path: str) -> str:
 
 
 def create_output_urdf(
-    input_urdf: str,
+    tree: ET.ElementTree,
     output_urdf: str,
     new_visual_dir: str,
     new_collision_dir: str | None,
 ):
     """
-    Copy URDF, replacing mesh paths to point to simplified directories.
+    Write a parsed URDF, replacing mesh paths to point to simplified directories.
 
     Handles any source directory in mesh paths (assets/, assets_visual/, etc).
+    The tree is modified in place.
     """
-    tree = ET.parse(input_urdf)
     root = tree.getroot()
 
     visual_prefix = _package_prefix(new_visual_dir)
     col_prefix = _package_prefix(new_collision_dir or new_visual_dir)
 
+    # Visual meshes -> visual dir, collision meshes -> collision dir (or visual dir)
+    prefixes = {"visual": visual_prefix, "collision": col_prefix}
     for link in root.iter("link"):
-        # Visual meshes -> visual dir
-        for visual in link.findall("visual"):
-            for mesh_el in visual.iter("mesh"):
-                fn = mesh_el.get("filename", "")
-                if fn.startswith("package://"):
-                    fn = fn[len("package://"):]
+        for section in link:
+            prefix = prefixes.get(section.tag)
+            if prefix is None:
+                continue
+            for mesh_el in section.iter("mesh"):
+                fn = mesh_el.get("filename", "").removeprefix(_PKG_PREFIX)
                 if fn.endswith(".stl"):
                     basename = os.path.basename(fn)
-                    mesh_el.set("filename", f"package://{visual_prefix}{basename}")
-
-        # Collision meshes -> collision dir (or visual dir)
-        for collision in link.findall("collision"):
-            for mesh_el in collision.iter("mesh"):
-                fn = mesh_el.get("filename", "")
-                if fn.startswith("package://"):
-                    fn = fn[len("package://"):]
-                if fn.endswith(".stl"):
-                    basename = os.path.basename(fn)
-                    mesh_el.set("filename", f"package://{col_prefix}{basename}")
+                    mesh_el.set("filename", f"{_PKG_PREFIX}{prefix}{basename}")
+
+    buf = io.BytesIO()
+    tree.write(buf, xml_declaration=True, encoding="utf-8")
+    if _write_if_changed(output_urdf, buf.getvalue()):
+        print(f"\nURDF written: {output_urdf}")
+    else:
+        print(f"\nURDF unchanged: {output_urdf}")
+
 
-    tree.write(output_urdf, xml_declaration=True, encoding="utf-8")
-    print(f"\nURDF written: {output_urdf}")
+def _missed_target_note(stats: dict, ratio: float) -> str:
+    """Warning suffix for a per-mesh line when decimation stopped short of the target."""
+    target = _decimation_target(stats["original"], ratio)
+    if stats["original"] == 0 or stats["final"] <= target * _TARGET_SLACK:
+        return ""
+    return f"  WARNING: missed target {target:,} tri"
 
 
-def main():
+def main(argv: list[str] | None = None):
     parser = argparse.ArgumentParser(
         description="Decimate STL meshes referenced by a URDF for faster simulation."
     )
@@ -187,6 +576,18 @@ def main():
         help="Use convex hulls for collision meshes (recommended for Gazebo). "
              "Much faster physics than decimated meshes.",
     )
+    parser.add_argument(
+        "--convex-decomposition",
+        action="store_true",
+        help="Decompose collision meshes into several convex hulls with CoACD "
+             "(better contacts for non-convex parts, slow one-time preprocess).",
+    )
+    parser.add_argument(
+        "--max-hulls",
+        type=int,
+        default=8,
+        help="Maximum convex hulls per mesh for --convex-decomposition (default: 8).",
+    )
     parser.add_argument(
         "--collision-ratio",
         type=float,
@@ -210,37 +611,107 @@ def main():
         help="Skip decimation for meshes with fewer triangles than this (default: 50000). "
              "Small meshes are copied as-is.",
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=os.cpu_count(),
+        help="Number of worker processes for mesh decimation (default: CPU count). "
+             "Use 1 to process meshes sequentially.",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["fqmr", "open3d"],
+        default="fqmr" if pyfqmr is not None else "open3d",
+        help="Decimation backend: 'fqmr' (pyfqmr, fast) or 'open3d' "
+             "(default: fqmr if installed, else open3d).",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=".mesh_cache/",
+        help="Directory for cached decimated meshes, keyed by source content "
+             "(default: .mesh_cache/)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always re-process meshes and don't touch the mesh cache.",
+    )
+    parser.add_argument(
+        "--outputs-stamp",
+        metavar="PATH",
+        default=None,
+        help="Write output digests to PATH, touching it only when an output changed "
+             "(lets ninja notice mesh-only changes).",
+    )
+    if argv is None:
+        argv = sys.argv[1:]
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.max_hulls < 1:
+        parser.error("--max-hulls must be at least 1")
+    if args.backend == "fqmr" and pyfqmr is None:
+        parser.error("--backend fqmr requires the 'pyfqmr' and 'trimesh' packages")
+    if args.backend == "open3d" and o3d is None:
+        parser.error("--backend open3d requires the 'open3d' package")
+    if args.convex_decomposition and coacd is None:
+        parser.error("--convex-decomposition requires the 'coacd' package")
 
     urdf_path = args.input
 
     # Resolve directories relative to CWD (not input file location)
     source_dir = args.source_dir
     visual_out = args.visual_dir
-    separate_collision = args.convex_collision or args.collision_ratio is not None
+    separate_collision = (
+        args.convex_collision or args.convex_decomposition or args.collision_ratio is not None
+    )
     collision_ratio = args.collision_ratio or args.ratio
     collision_out = args.collision_dir if separate_collision else None
+    if args.convex_decomposition:
+        collision_mode = "decomposition"
+    elif args.convex_collision:
+        collision_mode = "convex"
+    elif separate_collision:
+        collision_mode = "decimate"
+    else:
+        collision_mode = None
+
+    cache_dir = None if args.no_cache else args.cache_dir
 
     os.makedirs(visual_out, exist_ok=True)
     if collision_out:
         os.makedirs(collision_out, exist_ok=True)
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+
+    # Outputs are about to change; a stale manifest must not vouch for them
+    # (a new one is only written at the end of a cached run)
+    manifest_path = os.path.join(args.cache_dir, "manifest.json")
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
 
     # Find all meshes in URDF
-    mesh_files = find_urdf_meshes(urdf_path)
+    tree, mesh_files = load_urdf_meshes(urdf_path)
     print(f"Found {len(mesh_files)} unique STL meshes in {urdf_path}")
     print(f"Reading originals from: {source_dir}")
-    if args.convex_collision:
+    print(f"Decimation backend: {args.backend}")
+    if cache_dir:
+        print(f"Mesh cache: {cache_dir}")
+    if args.convex_decomposition:
+        print(f"Collision mode: CONVEX DECOMPOSITION (max {args.max_hulls} hulls)")
+    elif args.convex_collision:
         print(f"Collision mode: CONVEX HULL")
     elif separate_collision:
         print(f"Collision mode: decimate at {collision_ratio:.0%}")
     print()
 
-    total_original = 0
-    total_visual = 0
-    total_collision = 0
-    total_orig_size = 0
-    total_new_size = 0
-
+    # Build the work list up front so meshes can be processed in parallel.
+    # Byte-identical sources (mirrored links, repeated hardware) are only
+    # processed once and their outputs linked to the other names.
+    meshes = []  # (mesh_path, visual_path, col_path, digest)
+    missing = []  # referenced source meshes not found in source_dir
+    jobs = []
+    representative = {}  # digest -> basename of the mesh actually processed
     for mesh_rel in mesh_files:
         basename = os.path.basename(mesh_rel)
         # Always read from source dir
@@ -248,67 +719,95 @@ def main():
 
         if not os.path.exists(mesh_path):
             print(f"  SKIP  {basename} (not found in {args.source_dir})")
+            missing.append(mesh_path)
+            continue
+
+        visual_path = os.path.join(visual_out, basename)
+        col_path = os.path.join(collision_out, basename) if collision_out else None
+        digest = _file_digest(mesh_path)
+        meshes.append((mesh_path, visual_path, col_path, digest))
+        if digest in representative:
             continue
+        representative[digest] = basename
+        jobs.append((
+            mesh_path, visual_path, col_path, digest,
+            args.ratio, collision_mode, collision_ratio, args.min_triangles,
+            args.backend, cache_dir, args.max_hulls,
+        ))
+
+    results = {}  # digest -> stats
+    if len(jobs) < 2 or args.jobs == 1:
+        for job in jobs:
+            result = process_mesh(*job)
+            results[result["digest"]] = result
+    else:
+        # Recycle workers every few meshes so memory held by Open3D / the
+        # allocator is returned to the OS. multiprocessing.Pool rather than
+        # ProcessPoolExecutor(max_tasks_per_child=...), which can deadlock on 3.11.
+        with multiprocessing.Pool(args.jobs, maxtasksperchild=4) as pool:
+            for result in pool.starmap(process_mesh, jobs):
+                results[result["digest"]] = result
+
+    total_original = 0
+    total_visual = 0
+    total_collision = 0
+    total_orig_size = 0
+    total_new_size = 0
+    deduplicated = 0
+
+    # Report in URDF order regardless of completion order
+    for mesh_path, visual_path, col_path, digest in meshes:
+        basename = os.path.basename(mesh_path)
+        result = results[digest]
+        tri_count = result["triangles"]
+        orig_size = result["orig_size"]
+        new_size = result["new_size"]
+        stats_v = result["visual"]
+        stats_c = result["collision"]
 
-        orig_size = os.path.getsize(mesh_path)
         total_orig_size += orig_size
+        total_new_size += new_size
+        total_original += stats_v["original"]
+        total_visual += stats_v["final"]
+        if stats_c is not None:
+            total_collision += stats_c["final"]
 
-        tri_count = count_stl_triangles(mesh_path)
-        visual_path = os.path.join(visual_out, basename)
+        if basename != representative[digest]:
+            rep_name = representative[digest]
+            _link_or_copy(os.path.join(visual_out, rep_name), visual_path)
+            if col_path:
+                _link_or_copy(os.path.join(collision_out, rep_name), col_path)
+            deduplicated += 1
+            print(f"  {basename:40s}  {tri_count:>8,} tri  DUPLICATE of {rep_name}")
+            continue
 
-        # Skip decimation for small meshes
-        if tri_count < args.min_triangles:
-            if os.path.abspath(mesh_path) != os.path.abspath(visual_path):
-                shutil.copy2(mesh_path, visual_path)
-            total_original += tri_count
-            total_visual += tri_count
-            total_new_size += orig_size
+        if result["copied"]:
             print(
                 f"  {basename:40s}  {tri_count:>8,} tri  "
                 f"COPY (under {args.min_triangles:,} threshold)"
             )
-            # Collision for small meshes
-            if collision_out:
-                col_path = os.path.join(collision_out, basename)
-                if args.convex_collision:
-                    stats_c = convex_hull_mesh(mesh_path, col_path)
-                    total_collision += stats_c["final"]
-                    print(
-                        f"  {'  (collision convex)':40s}  "
-                        f"{tri_count:>8,} -> {stats_c['final']:>8,} tri"
-                    )
-                else:
-                    shutil.copy2(mesh_path, col_path)
-                    total_collision += tri_count
+            if collision_mode in ("convex", "decomposition"):
+                print(
+                    f"  {'  (collision ' + collision_mode + ')':40s}  "
+                    f"{tri_count:>8,} -> {stats_c['final']:>8,} tri"
+                )
             continue
 
-        # Visual mesh
-        stats_v = decimate_mesh(mesh_path, visual_path, args.ratio)
-        total_original += stats_v["original"]
-        total_visual += stats_v["final"]
-
-        new_size = os.path.getsize(visual_path)
-        total_new_size += new_size
-
         print(
             f"  {basename:40s}  {stats_v['original']:>8,} -> {stats_v['final']:>8,} tri  "
             f"({stats_v['reduction_pct']:5.1f}% reduction)  "
             f"{orig_size/1024/1024:.1f}MB -> {new_size/1024/1024:.1f}MB"
+            f"{'  (cached)' if stats_v.get('cached') else ''}"
+            f"{_missed_target_note(stats_v, args.ratio)}"
         )
-
-        # Collision mesh
-        if collision_out:
-            col_path = os.path.join(collision_out, basename)
-            if args.convex_collision:
-                stats_c = convex_hull_mesh(mesh_path, col_path)
-            else:
-                stats_c = decimate_mesh(mesh_path, col_path, collision_ratio)
-            total_collision += stats_c["final"]
-            mode = "convex" if args.convex_collision else "decimate"
+        if stats_c is not None:
+            note = ""
+            if collision_mode == "decimate":
+                note = _missed_target_note(stats_c, collision_ratio)
             print(
-                f"  {'  (collision ' + mode + ')':40s}  "
+                f"  {'  (collision ' + collision_mode + ')':40s}  "
                 f"{stats_c['original']:>8,} -> {stats_c['final']:>8,} tri  "
-                f"({stats_c['reduction_pct']:5.1f}% reduction)"
+                f"({stats_c['reduction_pct']:5.1f}% reduction){note}"
             )
 
     # Summary
@@ -322,14 +821,38 @@ def main():
         if collision_out:
             print(f"Overall collision reduction: {(1 - total_collision / total_original) * 100:.1f}%")
     print(f"Total size:  {total_orig_size/1024/1024:.1f} MB -> {total_new_size/1024/1024:.1f} MB")
+    if deduplicated:
+        print(f"Deduplicated: {deduplicated} meshes identical to another mesh (processed once)")
 
     # Create output URDF
     create_output_urdf(
-        urdf_path,
+        tree,
         args.output,
         args.visual_dir,
         args.collision_dir if collision_out else None,
     )
+    if cache_dir or args.outputs_stamp:
+        inputs = {os.path.abspath(urdf_path): _file_digest(urdf_path)}
+        for mesh_path in missing:
+            inputs[os.path.abspath(mesh_path)] = None
+        outputs = [os.path.abspath(args.output)]
+        for mesh_path, visual_path, col_path, digest in meshes:
+            inputs[os.path.abspath(mesh_path)] = digest
+            outputs.append(os.path.abspath(visual_path))
+            if col_path:
+                outputs.append(os.path.abspath(col_path))
+        output_digests = {path: _file_digest(path) for path in sorted(outputs)}
+
+        if cache_dir:
+            write_manifest(manifest_path, argv, inputs, output_digests)
+        if args.outputs_stamp:
+            stamp_dir = os.path.dirname(args.outputs_stamp)
+            if stamp_dir:
+                os.makedirs(stamp_dir, exist_ok=True)
+            _write_if_changed(
+                args.outputs_stamp, json.dumps(output_digests, indent=2).encode()
+            )
+
     print(f"\nDone! Use '{args.output}' for simulation.")
 
 
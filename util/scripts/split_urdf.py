@@ -175,7 +175,7 @@ def build_xacro(
     return "\n".join(lines)
 
 
-def main():
+def main(argv: list[str] | None = None):
     parser = argparse.ArgumentParser(
         description="Split a URDF into separate xacro files for joints and links."
     )
@@ -217,7 +217,7 @@ def main():
         action="store_true",
         help="Add xacro support for fixed_legs argument (leg joints become fixed when set)",
     )
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # Parse input
     tree = ET.parse(args.input)
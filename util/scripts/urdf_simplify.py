@@ -533,13 +533,13 @@ def indent_xml(elem, level=0):
 
 # ─── Main ─────────────────────────────────────────────────────────────────────
 
-def main():
+def main(argv: list[str] | None = None):
     parser = argparse.ArgumentParser(description='Simplify URDF: reorient frames, fix axes, merge links')
     parser.add_argument('input_urdf', help='Input URDF file path')
     parser.add_argument('--output', '-o', help='Output URDF file (default: <input>_simplified.urdf)')
     parser.add_argument('--config', '-c', default='util/configs/simplify_config.yaml',
                         help='YAML config with strip_meshes list (default: util/configs/simplify_config.yaml)')
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     if not os.path.exists(args.input_urdf):
         print(f"Error: '{args.input_urdf}' not found.")